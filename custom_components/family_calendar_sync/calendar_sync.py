@@ -1,31 +1,66 @@
 """Module to handle syncing between the local calendar and CalDAV calendar."""
 
-from dataclasses import asdict, dataclass
+import asyncio
+from collections.abc import Iterable, KeysView
+from dataclasses import dataclass
 import datetime
 from datetime import datetime, timedelta
-from hashlib import sha256
+from functools import cached_property, lru_cache
+from hashlib import blake2b
 import logging
 import re
+import sys
 
-from homeassistant.components.calendar import CalendarEntity
+from homeassistant.components.calendar import CalendarEntity, CalendarEvent
 from homeassistant.core import HomeAssistant
 from homeassistant.util import dt as dt_util
 
-from .const import DEFAULT_DAYS_TO_SYNC, HASH_LENGTH
+from .const import DEFAULT_DAYS_TO_SYNC, DOMAIN, HASH_LENGTH
 
 HASH_REGEX = re.compile(r"\[([a-z0-9]{8})\]", re.IGNORECASE)
+WORD_REGEX = re.compile(r"\w+")
+# the `CalendarEvent` fields that `Event` reads
+EVENT_FIELDS = (
+    "summary",
+    "description",
+    "location",
+    "start",
+    "end",
+    "uid",
+    "rrule",
+    "recurrence_id",
+)
 
 _LOGGER = logging.getLogger(__name__)
 
 
-@dataclass
+@lru_cache(maxsize=4096)
+def _compute_parent_hash(
+    uid: str | None,
+    recurrence_id: str | None,
+    start_iso: str | None,
+    end_iso: str | None,
+    summary: str | None,
+    description: str | None,
+    location: str | None,
+) -> str:
+    """Return the short hash for a parent event's identifying fields.
+
+    Cached so events that are unchanged between syncs are not re-hashed.
+    """
+    fields = (uid, recurrence_id, start_iso, end_iso, summary, description, location)
+    data = "\x1f".join("" if field is None else field for field in fields).encode()
+    return blake2b(data, digest_size=HASH_LENGTH // 2).hexdigest()
+
+
+@dataclass(frozen=True)
 class SyncDateRange:
     """A dataclass for start and end dates for syncing."""
 
     start: datetime
     days_to_sync: int
 
-    @property
+    @cached_property
     def end(self) -> datetime:
         """Return the end datetime."""
         end_datetime = self.start + timedelta(days=self.days_to_sync)
@@ -64,13 +99,9 @@ class Event:
         hashed_value: str,
     ) -> str | None:
         """Modify description by adding hashed value to it."""
-        hashed_description = None
         if description:
-            hashed_description = f"{description} \n[{hashed_value}]"
-        else:
-            hashed_description = f"[{hashed_value}]"
-
-        return hashed_description
+            return f"{description} \n[{hashed_value}]"
+        return f"[{hashed_value}]"
 
     def get_data_for_event_creation(self) -> dict:
         """Get event data in the format to create a new HA event."""
@@ -193,8 +224,22 @@ class ChildEvent(Event):
         """Extract the hashed_value from the event description field. None, if not found."""
         hashed_value = None
         if description := self.description:
-            if match := HASH_REGEX.search(description):
+            # the hash is normally appended to the end of the description, so check
+            # there before falling back to searching the whole string
+            tail = description[-(HASH_LENGTH + 2) :]
+            if (
+                len(tail) == HASH_LENGTH + 2
+                and tail[0] == "["
+                and tail[-1] == "]"
+                and tail[1:-1].isascii()
+                and tail[1:-1].isalnum()
+            ):
+                hashed_value = tail[1:-1]
+            elif match := HASH_REGEX.search(description):
                 hashed_value = match.group(1)
+        if hashed_value is not None:
+            # matching parent and child hashes then share one string object
+            hashed_value = sys.intern(hashed_value)
         self._hashed_value = hashed_value
 
 
@@ -204,19 +249,24 @@ class ParentEvent(Event):
     def create_child_event(self) -> ChildEvent:
         """Create a `ChildEvent` from the event data."""
         child_data = self.get_data_for_child_event()
-        child_event = ChildEvent(child_data)
-        # add hash to description
-        if description := child_event.description:
-            child_event.description = description + f" [{self.hashed_value}]"
-        else:
-            child_event.description = f" [{self.hashed_value}]"
-        return child_event
+        # `get_data_for_child_event` already added the hash to the description
+        return ChildEvent(child_data)
 
     def _set_hashed_value(self):
         """Calculate the hashed value of the event data."""
-        data = f"{self.data}".encode()
-        hashed_value = sha256(data).hexdigest()
-        self._hashed_value = hashed_value[:HASH_LENGTH]
+        data = self._data
+        start = data.get("start")
+        end = data.get("end")
+        hashed_value = _compute_parent_hash(
+            data.get("uid"),
+            data.get("recurrence_id"),
+            start.isoformat() if start is not None else None,
+            end.isoformat() if end is not None else None,
+            data.get("summary"),
+            data.get("description"),
+            data.get("location"),
+        )
+        self._hashed_value = sys.intern(hashed_value)
 
     def get_data_for_child_event(self) -> dict:
         """Create a dict of data for use in ChildEvent creation."""
@@ -224,13 +274,12 @@ class ParentEvent(Event):
         event_data["start"] = self.start
         event_data["end"] = self.end
         event_data["summary"] = self.title
-        if description := self.description:
-            # append the hashed_value to the description, which is where we will look for
-            # the hashed value when attempting to sync events
-            hashed_description = f"{description} [{self.hashed_value}]"
-            event_data["description"] = hashed_description
-        else:
-            event_data["description"] = f"[{self.hashed_value}]"
+        # append the hashed_value to the description, which is where we will look for
+        # the hashed value when attempting to sync events
+        event_data["description"] = self.add_hash_to_description(
+            description=self.description,
+            hashed_value=self.hashed_value,
+        )
 
         if location := self.location:
             event_data["location"] = location
@@ -296,18 +345,17 @@ class Calendar:
         return self._type
 
     @property
-    def hash_set(self) -> set[str]:
+    def hash_set(self) -> KeysView[str]:
         """Return the hashes."""
-        return set(self.hash_map.keys())
+        return self._hash_map.keys()
 
-    def remove_events_to_ignore(self) -> None:
-        """Remove events from that need to be ignored."""
-        raise NotImplementedError
+    def should_ignore_event(self, event_data: CalendarEvent) -> bool:
+        """Determine if the event needs to be ignored."""
+        return False
 
     async def async_load_events(self):
         """Get events using hass object and load into calendar object."""
-        cal = self._hass.data.get("calendar").get_entity(self.entity_id)
-        if cal:
+        if cal := self.entity:
             events_data = await cal.async_get_events(
                 self._hass,
                 self._sync_date_range.start,
@@ -315,15 +363,17 @@ class Calendar:
             )
 
             for event_data in events_data:
+                if self.should_ignore_event(event_data):
+                    continue
                 event = None
+                # shallow copy of only the fields we use; `asdict` deep copies everything
+                data = {field: getattr(event_data, field, None) for field in EVENT_FIELDS}
                 if self.type == "parent":
-                    event = ParentEvent(asdict(event_data))
+                    event = ParentEvent(data)
                 else:
-                    event = ChildEvent(asdict(event_data))
+                    event = ChildEvent(data)
                 self._events.append(event)
 
-        if self.type == "parent":
-            self.remove_events_to_ignore()
         self._create_hash_map()
         return True
 
@@ -361,20 +411,25 @@ class ParentCalendar(Calendar):
             cal_type="parent",
         )
         self._ignore_string = ignore_string
+        self._titles: str | None = None
 
     @property
     def ignore_string(self) -> str | None:
         """Return ignore_string."""
         return self._ignore_string
 
-    def remove_events_to_ignore(self) -> None:
-        """Remove events whose title starts with the string we are to ignore."""
-        if self.ignore_string:
-            self.events = [
-                event
-                for event in self.events
-                if not event.title.startswith(self._ignore_string)
-            ]
+    @property
+    def titles(self) -> str:
+        """Return the titles of all events, one per line."""
+        if self._titles is None:
+            self._titles = "\n".join(event.title for event in self.events)
+        return self._titles
+
+    def should_ignore_event(self, event_data: CalendarEvent) -> bool:
+        """Determine if the event's title starts with the string we are to ignore."""
+        if ignore_string := self._ignore_string:
+            return event_data.summary.startswith(ignore_string)
+        return False
 
 
 class ChildCalendar(Calendar):
@@ -395,11 +450,25 @@ class ChildCalendar(Calendar):
             cal_type="child",
         )
         self._keywords = keywords
-        if keywords:
-            reg_string = r"\b(" + f"{'|'.join(keywords)}" + r")\b"
-            self._regex_pattern = re.compile(reg_string, re.IGNORECASE | re.MULTILINE)
+        # single word keywords are matched with one set lookup per word in the title;
+        # only keywords spanning several words need the regex
+        self._keyword_words = frozenset(
+            keyword.lower() for keyword in keywords if WORD_REGEX.fullmatch(keyword)
+        )
+        phrases = [
+            re.escape(keyword.lower())
+            for keyword in keywords
+            if not WORD_REGEX.fullmatch(keyword)
+        ]
+        if phrases:
+            # titles are lowercased before matching, so no need for IGNORECASE.
+            # lookarounds instead of \b so keywords may start or end with punctuation
+            reg_string = r"(?<!\w)(" + f"{'|'.join(phrases)}" + r")(?!\w)"
+            self._regex_pattern = re.compile(reg_string)
         else:
             self._regex_pattern = None
+        # recurring events share a title, so only match each distinct title once
+        self._keyword_match_cache: dict[str, bool] = {}
 
     @property
     def keywords(self) -> list[str]:
@@ -408,7 +477,26 @@ class ChildCalendar(Calendar):
 
     def is_a_keyword_match(self, title: str) -> bool:
         """Determine if a keyword is found in `title`."""
-        if not self._keywords or self._regex_pattern is None:
+        if not self._keywords:
+            return False
+        if (is_match := self._keyword_match_cache.get(title)) is None:
+            is_match = self._keyword_match_cache[title] = self._search_keywords(title)
+        return is_match
+
+    def has_keyword_match(self, text: str) -> bool:
+        """Determine if a keyword is found in `text`, without caching the result."""
+        if not self._keywords:
+            return False
+        return self._search_keywords(text)
+
+    def _search_keywords(self, title: str) -> bool:
+        """Search `title` for a keyword."""
+        title = title.lower()
+        if self._keyword_words and not self._keyword_words.isdisjoint(
+            WORD_REGEX.findall(title)
+        ):
+            return True
+        if self._regex_pattern is None:
             return False
         return bool(self._regex_pattern.search(title))
 
@@ -416,6 +504,7 @@ class ChildCalendar(Calendar):
         """Delete the child event from home assistant with matching `hashed_value`."""
         event = self.get_event_with_hash(hashed_value=hashed_value)
         await self.entity.async_delete_event(event.uid)
+        del self._hash_map[hashed_value]
 
     async def async_delete_event_from_ha(self, values: str | set[str]):
         """Delete the child event from home assistant with matching `hashed_value`."""
@@ -460,13 +549,9 @@ class ChildCalendar(Calendar):
         # self.hash_map[child_event.hashed_value] = child_event
         # self.events.append(child_event)
 
-    def overlapping_hashes(self, hashed_values: list[str]) -> list[str]:
+    def overlapping_hashes(self, hashed_values: Iterable[str]) -> list[str]:
         """Return list of hashed_values if they exist for this calendar."""
-        return [
-            hashed_value
-            for hashed_value in hashed_values
-            if hashed_value in self.hash_set
-        ]
+        return list(self._hash_map.keys() & hashed_values)
 
 
 class SyncWorker:
@@ -527,7 +612,6 @@ class SyncWorker:
                     sync_date_range=self._sync_date_range,
                     ignore_string=self._ignore_event_if_title_starts_with,
                 )
-                await calendar.async_setup()
                 self.calendars["parent"].append(calendar)
 
         if child_cals := self.config["child"]:
@@ -544,9 +628,16 @@ class SyncWorker:
                     sync_date_range=self._sync_date_range,
                     keywords=keywords,
                 )
-                await calendar.async_setup()
                 self.calendars["child"].append(calendar)
 
+        # load the events for all calendars concurrently
+        await asyncio.gather(
+            *(
+                calendar.async_setup()
+                for calendar in self.calendars["parent"] + self.calendars["child"]
+            )
+        )
+
         num_parent_cals = self.num_of_parent_calendars
         num_child_cals = self.num_of_child_calendars
         if (num_parent_cals == 0) or (num_child_cals == 0):
@@ -555,35 +646,53 @@ class SyncWorker:
             _LOGGER.error(msg)
 
     def _set_of_hashes_by_cal_type(self, cal_type: str) -> set:
-        result = set()
-        for cal in self.calendars[cal_type]:
-            result.update(cal.hash_set)
-        return result
+        return set().union(*(cal.hash_set for cal in self.calendars[cal_type]))
 
     async def _async_remove_events_from_child_cals(self, event_hashes: list):
         """Remove events from child calendars."""
-        for cal in self.calendars["child"]:
-            await cal.async_delete_event_from_ha(event_hashes)
-
-    async def _async_sync_parent_to_child(
-        self, parent_cal: ParentCalendar, child_cal: ChildCalendar
-    ):
-        should_add_all_events: bool = (
-            self._copy_all_map.get(child_cal.entity_id, None) == parent_cal.entity_id
+        await asyncio.gather(
+            *(
+                cal.async_delete_event_from_ha(event_hashes)
+                for cal in self.calendars["child"]
+            )
         )
-        for parent_event in parent_cal.events:
-            if (
-                child_cal.is_a_keyword_match(parent_event.title)
-                or should_add_all_events
-            ):
-                # make sure the event doesn't already exist in child calendar
-                if not child_cal.is_event_in_calendar_with_hash(
-                    parent_event.hashed_value
-                ):
-                    await child_cal.async_add_event(parent_event)
+
+    def _unique_parent_events(self) -> dict[str, tuple[ParentEvent, set[str]]]:
+        """Return each parent event once, keyed by hash.
+
+        The same event can be on more than one parent calendar (ex: shared invites),
+        so each event is kept with the entity_ids of every parent calendar it is on.
+        """
+        result: dict[str, tuple[ParentEvent, set[str]]] = {}
+        for parent_cal in self.calendars["parent"]:
+            for parent_event in parent_cal.events:
+                if (entry := result.get(parent_event.hashed_value)) is None:
+                    result[parent_event.hashed_value] = (
+                        parent_event,
+                        {parent_cal.entity_id},
+                    )
+                else:
+                    entry[1].add(parent_cal.entity_id)
+        return result
+
+    def _hashes_by_entity_id(self) -> dict[str, frozenset[str]]:
+        """Return the hashes of every calendar, keyed by entity_id."""
+        return {
+            cal.entity_id: frozenset(cal.hash_map)
+            for cal in self.calendars["parent"] + self.calendars["child"]
+        }
 
     async def async_sync_calendars(self) -> None:
         """Sync ParentCalendar events to ChildCalenders."""
+        # HA calendars don't expose a ctag/sync token, so compare against the hashes
+        # left behind by the last completed sync instead. If no calendar has changed
+        # since then, there is nothing to add or remove.
+        sync_state: dict = self._hass.data.setdefault(DOMAIN, {})
+        hashes_by_entity_id = self._hashes_by_entity_id()
+        if sync_state.get("last_synced_hashes") == hashes_by_entity_id:
+            _LOGGER.debug("No calendar changes since the last sync")
+            return
+
         # compare hashes
         parentset = self._set_of_hashes_by_cal_type("parent")
         childset = self._set_of_hashes_by_cal_type("child")
@@ -591,18 +700,63 @@ class SyncWorker:
         # TODO: Need to reparse all events in case config has changed.
         # Can a previous config be saved to do a diff against?
         await self._async_remove_events_from_child_cals(need_removed)
-        
-        # Only sync parent calendars with their designated child calendars
-        for child_cal in self.calendars["child"]:
-            # Get the parent entity_id this child should copy all from
-            parent_entity_id = self._copy_all_map.get(child_cal.entity_id)
-            
-            for parent_cal in self.calendars["parent"]:
-                # Only sync if:
-                # 1. This parent is designated as copy_all for this child, OR
-                # 2. The child has keywords that might match events in this parent
-                if (parent_entity_id == parent_cal.entity_id) or child_cal.keywords:
-                    await self._async_sync_parent_to_child(parent_cal, child_cal)
+
+        # each child calendar is independent of the others, so sync them concurrently.
+        # events for a single child are still created one at a time.
+        parent_events = self._unique_parent_events()
+        await asyncio.gather(
+            *(
+                self._async_sync_child(child_cal, parent_events)
+                for child_cal in self.calendars["child"]
+            )
+        )
+        sync_state["last_synced_hashes"] = self._hashes_by_entity_id()
+
+    async def _async_sync_child(
+        self,
+        child_cal: ChildCalendar,
+        parent_events: dict[str, tuple[ParentEvent, set[str]]],
+    ) -> None:
+        """Sync the unique parent events to a single `ChildCalendar`."""
+        # Get the parent entity_id this child should copy all from
+        copy_all_from = self._copy_all_map.get(child_cal.entity_id)
+
+        # Only parents with at least one keyword match are worth checking by keyword.
+        # One match over all of a parent's titles lets us skip parents without any
+        # matching events instead of checking every event.
+        keyword_parents: set[str] = set()
+        if child_cal.keywords:
+            keyword_parents = {
+                parent_cal.entity_id
+                for parent_cal in self.calendars["parent"]
+                if child_cal.has_keyword_match(parent_cal.titles)
+            }
+
+        child_hash_map = child_cal.hash_map
+        async_add_event = child_cal.async_add_event
+        if not keyword_parents:
+            if copy_all_from is None:
+                return
+            # copy_all only, no need to check keywords at all
+            for hashed_value, (parent_event, entity_ids) in parent_events.items():
+                if copy_all_from in entity_ids and hashed_value not in child_hash_map:
+                    await async_add_event(parent_event)
+            return
+
+        is_a_keyword_match = child_cal.is_a_keyword_match
+        for hashed_value, (parent_event, entity_ids) in parent_events.items():
+            # make sure the event doesn't already exist in child calendar before
+            # doing the more expensive keyword match
+            if hashed_value in child_hash_map:
+                continue
+            # Only add if:
+            # 1. It is on the parent designated as copy_all for this child, OR
+            # 2. It is on a parent with keyword matches and its title matches
+            if copy_all_from in entity_ids or (
+                not keyword_parents.isdisjoint(entity_ids)
+                and is_a_keyword_match(parent_event.title)
+            ):
+                await async_add_event(parent_event)
 
 
 async def sync_family_calendar(hass: HomeAssistant, config: dict):